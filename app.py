@@ -1,8 +1,68 @@
+import io
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import streamlit as st
 import pandas as pd
 
 st.set_page_config(page_title="GPT Result Checker", layout="wide")
 
+
+@st.cache_data(show_spinner=False)
+def _load_csv(data):
+    # casenumber is an identifier, not a number; annotation columns are pinned
+    # to string so an all-empty column from a previously exported CSV is not
+    # read as an unwritable null column. column_types entries for columns the
+    # file lacks are ignored
+    try:
+        table = pa_csv.read_csv(
+            io.BytesIO(data),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={
+                    'casenumber': pa.string(),
+                    'Validation Status': pa.string(),
+                    'Comments': pa.string(),
+                },
+                strings_can_be_null=True,
+            ),
+        )
+    except pa.ArrowInvalid:
+        table = None
+    if table is None or len(set(table.column_names)) < table.num_columns:
+        # short rows and duplicate headers are left to the C engine, which
+        # pads the missing fields and renames repeats to Result.1 etc.
+        df = pd.read_csv(
+            io.BytesIO(data),
+            dtype_backend="pyarrow",
+            dtype={'casenumber': str, 'Validation Status': str, 'Comments': str},
+        )
+    else:
+        # the arrow reader infers timestamps and would rewrite them on export;
+        # re-read just those columns as the original text
+        temporal_cols = [
+            field.name for field in table.schema if pa.types.is_temporal(field.type)
+        ]
+        if temporal_cols:
+            raw = pa_csv.read_csv(
+                io.BytesIO(data),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=temporal_cols,
+                    column_types={col: pa.string() for col in temporal_cols},
+                    strings_can_be_null=True,
+                ),
+            )
+            for col in temporal_cols:
+                table = table.set_column(
+                    table.schema.get_field_index(col), col, raw[col]
+                )
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+    # low-cardinality filter columns; categories double as sorted options
+    for col in ['environment', 'Prompt Name', 'Model', 'FileName', 'attachment_name']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
 if 'df' not in st.session_state:
     st.session_state.df = None
 
@@ -10,7 +70,7 @@ st.title("GPT Result Checker")
 
 uploaded_file = st.file_uploader("Upload CSV", type="csv")
 if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file)
+    df = _load_csv(uploaded_file.getvalue())
     if 'Validation Status' not in df.columns:
         df['Validation Status'] = ''
     if 'Comments' not in df.columns:
@@ -21,19 +81,19 @@ if st.session_state.df is not None:
     df = st.session_state.df
     st.sidebar.header("Filters")
     env_filter = st.sidebar.multiselect(
-        "Environment", options=sorted(df['environment'].dropna().unique())
+        "Environment", options=df['environment'].cat.categories.tolist()
     )
 
     prompt_filter = []
     if 'Prompt Name' in df.columns:
         prompt_filter = st.sidebar.multiselect(
-            "Prompt Name", options=sorted(df['Prompt Name'].dropna().unique())
+            "Prompt Name", options=df['Prompt Name'].cat.categories.tolist()
         )
 
     model_filter = []
     if 'Model' in df.columns:
         model_filter = st.sidebar.multiselect(
-            "Model", options=sorted(df['Model'].dropna().unique())
+            "Model", options=df['Model'].cat.categories.tolist()
         )
 
     file_filter = []
@@ -41,44 +101,45 @@ if st.session_state.df is not None:
     if 'FileName' in df.columns:
         file_col = 'FileName'
         file_filter = st.sidebar.multiselect(
-            "FileName", options=sorted(df[file_col].dropna().unique())
+            "FileName", options=df[file_col].cat.categories.tolist()
         )
     elif 'attachment_name' in df.columns:
         file_col = 'attachment_name'
         file_filter = st.sidebar.multiselect(
-            "Attachment Name", options=sorted(df[file_col].dropna().unique())
+            "Attachment Name", options=df[file_col].cat.categories.tolist()
         )
 
     search_case = st.sidebar.text_input("Search casenumber")
 
-    filtered_df = df.copy()
+    case_str = df['casenumber'].astype(str)
+
+    mask = pd.Series(True, index=df.index)
     if env_filter:
-        filtered_df = filtered_df[filtered_df['environment'].isin(env_filter)]
+        mask &= df['environment'].isin(env_filter)
     if prompt_filter and 'Prompt Name' in df.columns:
-        filtered_df = filtered_df[filtered_df['Prompt Name'].isin(prompt_filter)]
+        mask &= df['Prompt Name'].isin(prompt_filter)
     if model_filter and 'Model' in df.columns:
-        filtered_df = filtered_df[filtered_df['Model'].isin(model_filter)]
+        mask &= df['Model'].isin(model_filter)
     if file_filter and file_col:
-        filtered_df = filtered_df[filtered_df[file_col].isin(file_filter)]
+        mask &= df[file_col].isin(file_filter)
     if search_case:
-        filtered_df = filtered_df[
-            filtered_df['casenumber'].astype(str).str.contains(search_case)
-        ]
+        mask &= case_str.str.contains(search_case, regex=False)
+    filtered_df = df.loc[mask]
 
     st.sidebar.header("Batch Actions")
     selected_cases = st.sidebar.multiselect(
-        "Select casenumbers", filtered_df['casenumber'].astype(str)
+        "Select casenumbers", case_str[mask]
     )
     batch_status = st.sidebar.selectbox(
         "Status", ['', 'Valid', 'Invalid', 'Needs Review']
     )
     batch_comment = st.sidebar.text_input("Comment for batch")
     if st.sidebar.button("Apply") and selected_cases:
-        mask = df['casenumber'].astype(str).isin(selected_cases)
+        batch_mask = case_str.isin(set(selected_cases))
         if batch_status:
-            df.loc[mask, 'Validation Status'] = batch_status
+            df.loc[batch_mask, 'Validation Status'] = batch_status
         if batch_comment:
-            df.loc[mask, 'Comments'] = batch_comment
+            df.loc[batch_mask, 'Comments'] = batch_comment
         st.session_state.df = df
 
     st.subheader("Records")
@@ -101,18 +162,20 @@ if st.session_state.df is not None:
     )
 
     # update original df with edits
-    for idx in edited_df.index:
-        st.session_state.df.loc[idx, 'Validation Status'] = edited_df.loc[idx, 'Validation Status']
-        st.session_state.df.loc[idx, 'Comments'] = edited_df.loc[idx, 'Comments']
+    edit_cols = ['Validation Status', 'Comments']
+    edit_idx = edited_df.index.intersection(st.session_state.df.index)
+    st.session_state.df.loc[edit_idx, edit_cols] = edited_df.loc[edit_idx, edit_cols].to_numpy()
+
+    # positional rows per casenumber, for O(1) lookups of the selected case
+    edited_cases = edited_df['casenumber'].astype(str)
+    case_rows = edited_df.groupby(edited_cases, sort=False).indices
 
     st.subheader("View Result")
     if not edited_df.empty:
         case_view = st.selectbox(
-            "Select casenumber", edited_df['casenumber'].astype(str)
+            "Select casenumber", edited_cases
         )
-        record = edited_df[
-            edited_df['casenumber'].astype(str) == case_view
-        ].iloc[0]
+        record = edited_df.iloc[case_rows[case_view][0]]
         if result_col and result_col in record:
             st.write(record.drop(result_col))
             with st.expander(result_col):
@@ -123,9 +186,9 @@ if st.session_state.df is not None:
     st.subheader("Compare Model Results")
     if 'Model' in edited_df.columns and result_col:
         compare_case = st.selectbox(
-            "Casenumber to compare", sorted(edited_df['casenumber'].astype(str).unique()), key="compare_case"
+            "Casenumber to compare", sorted(case_rows), key="compare_case"
         )
-        compare_df = edited_df[edited_df['casenumber'].astype(str) == compare_case]
+        compare_df = edited_df.iloc[case_rows.get(compare_case, [])]
         if file_col and file_col in compare_df.columns:
             file_options = sorted(compare_df[file_col].dropna().astype(str).unique())
             if file_options:
@@ -149,7 +212,7 @@ if st.session_state.df is not None:
 
     st.subheader("Statistics")
     st.write(
-        edited_df['environment'].value_counts().rename("count")
+        edited_df['environment'].value_counts().loc[lambda s: s > 0].rename("count")
     )
     st.write(
         edited_df['Validation Status'].value_counts().rename("status")
@@ -158,9 +221,11 @@ if st.session_state.df is not None:
     def convert_df(df):
         return df.to_csv(index=False).encode('utf-8')
 
+    # serialize only when the button is clicked, not on every rerun
+    export_df = st.session_state.df
     st.download_button(
         "Download annotated CSV",
-        convert_df(st.session_state.df),
+        lambda: convert_df(export_df),
         "validated_results.csv",
         "text/csv",
     )